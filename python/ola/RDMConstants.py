@@ -40,11 +40,10 @@ RDM_MAX_DOMAIN_NAME_LENGTH = 231
 RDM_DNS_NAME_SERVER_MAX_INDEX = 2
 
 
-def _ReverseDict(input):
-  output = {}
-  for key, value in input.items():
-    output[value] = key
-  return output
+def _ReverseDict(source):
+  # zip()-ing the two views pairs each value with its key in one C-level
+  # pass; keys() and values() iterate in the same order.
+  return dict(zip(source.values(), source.keys()))
 
 
 SENSOR_TYPES = {
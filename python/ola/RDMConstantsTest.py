@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+# RDMConstantsTest.py
+# Copyright (C) 2026 Simon Newton
+
+import unittest
+from ola import RDMConstants
+
+"""Test cases for the RDM constant tables."""
+
+__author__ = 'nomis52@gmail.com (Simon Newton)'
+
+
+# (forward table, reverse table) pairs built via _ReverseDict.
+TABLE_PAIRS = [
+    (RDMConstants.SENSOR_TYPES, RDMConstants.SENSOR_TYPE_TO_NAME),
+    (RDMConstants.UNITS, RDMConstants.UNIT_TO_NAME),
+    (RDMConstants.PREFIXES, RDMConstants.PREFIX_TO_NAME),
+    (RDMConstants.PRODUCT_CATEGORIES, RDMConstants.PRODUCT_CATEGORY_TO_NAME),
+    (RDMConstants.PRODUCT_DETAIL_IDS, RDMConstants.PRODUCT_DETAIL_IDS_TO_NAME),
+    (RDMConstants.SLOT_TYPES, RDMConstants.SLOT_TYPE_TO_NAME),
+    (RDMConstants.SLOT_DEFINITIONS, RDMConstants.SLOT_DEFINITION_TO_NAME),
+    (RDMConstants.PRESET_PROGRAMMED, RDMConstants.PRESET_PROGRAMMER_TO_NAME),
+    (RDMConstants.MERGE_MODE, RDMConstants.MERGE_MODE_TO_NAME),
+]
+
+
+class RDMConstantsTest(unittest.TestCase):
+
+  def testReverseTablesAreConsistent(self):
+    for forward, reverse in TABLE_PAIRS:
+      self.assertEqual(len(forward), len(reverse))
+      for name, value in forward.items():
+        self.assertEqual(reverse[value], name)
+
+  def testReverseTablesShareKeyStrings(self):
+    # The reverse tables should reference the same string objects as the
+    # forward tables, rather than holding copies.
+    for forward, reverse in TABLE_PAIRS:
+      for name, value in forward.items():
+        self.assertTrue(reverse[value] is name)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -117,9 +117,21 @@ class TestFixture(object):
     """Whether a valid PID is required for this test"""
     return True
 
+  # Cache of (pid_name, uid) -> Pid object, shared by all fixtures. The PID
+  # store is immutable once loaded so entries never go stale.
+  _PID_LOOKUP_CACHE = {}
+
   def LookupPid(self, pid_name):
     return self._pid_store.GetName(pid_name, self._uid)
 
+  def LookupPidCached(self, pid_name):
+    """Like LookupPid, but memoized; use for repeated lookups in callbacks."""
+    key = (pid_name, self._uid)
+    pid = self._PID_LOOKUP_CACHE.get(key)
+    if pid is None:
+      pid = self._PID_LOOKUP_CACHE[key] = self.LookupPid(pid_name)
+    return pid
+
   def LookupPidValue(self, pid_value):
     return self._pid_store.GetPid(pid_value)
 
@@ -15,8 +15,8 @@
 # TestDefinitions.py
 # Copyright (C) 2010 Simon Newton
 
+import collections
 import datetime
-import operator
 import struct
 from ExpectedResults import (AckGetResult, BroadcastResult, NackGetResult,
                              InvalidResponse, TimeoutResult, UnsupportedResult,
@@ -48,6 +48,11 @@ __author__ = 'nomis52@gmail.com (Simon Newton)'
 
 MAX_PERSONALITY_NUMBER = 255
 
+# Pre-compiled formats for the raw GET / SET payloads used below, so the
+# format string isn't re-parsed at each call site.
+UINT8_STRUCT = struct.Struct('!B')
+UINT16_STRUCT = struct.Struct('!H')
+
 
 # Mute Tests
 # -----------------------------------------------------------------------------
@@ -153,7 +158,7 @@ class RequestsWhileUnmuted(ResponderTestFixture):
     self.SendDiscovery(ROOT_DEVICE, self.pid)
 
   def GetDeviceInfo(self):
-    device_info_pid = self.LookupPid('DEVICE_INFO')
+    device_info_pid = self.LookupPidCached('DEVICE_INFO')
     self.AddExpectedResults(AckGetResult(device_info_pid.value))
     self.SendGet(ROOT_DEVICE, device_info_pid)
 
@@ -518,6 +523,21 @@ class DeviceInfoTest(object):
       'protocol_minor': 0,
   }
 
+  def _CachedAckGetResult(self, **kwargs):
+    """The AckGetResult for FIELDS / FIELD_VALUES, built once per class.
+
+    The arguments are static per subclass and the result objects are
+    immutable, so the same result can be reused across runs.
+    """
+    cls = type(self)
+    result = cls.__dict__.get('_cached_ack_get_result')
+    if result is None:
+      result = self.AckGetResult(field_names=self.FIELDS,
+                                 field_values=self.FIELD_VALUES,
+                                 **kwargs)
+      cls._cached_ack_get_result = result
+    return result
+
 
 class GetDeviceInfo(DeviceInfoTest, ResponderTestFixture):
   """GET device info & verify."""
@@ -534,9 +554,7 @@ class GetDeviceInfo(DeviceInfoTest, ResponderTestFixture):
   ]
 
   def Test(self):
-    self.AddExpectedResults(self.AckGetResult(
-      field_names=self.FIELDS,
-      field_values=self.FIELD_VALUES))
+    self.AddExpectedResults(self._CachedAckGetResult())
     self.SendGet(ROOT_DEVICE, self.pid)
 
   def VerifyResult(self, unused_response, fields):
@@ -579,9 +597,7 @@ class GetDeviceInfoWithData(DeviceInfoTest, ResponderTestFixture):
   def Test(self):
     self.AddExpectedResults([
       self.NackGetResult(RDMNack.NR_FORMAT_ERROR),
-      self.AckGetResult(
-        field_names=self.FIELDS,
-        field_values=self.FIELD_VALUES,
+      self._CachedAckGetResult(
         warning='Get %s with data returned an ack' % self.pid.name)
     ])
     self.SendRawGet(ROOT_DEVICE, self.pid, 'x')
@@ -749,6 +765,53 @@ class GetSupportedParameters(ResponderTestFixture):
         'DNS_IPV4_NAME_SERVER', 'DNS_HOSTNAME', 'DNS_DOMAIN_NAME']),
   ]
 
+  # Lazily built lookup state; the PID store doesn't change for the life of
+  # a run. _PID_BY_NAME covers every name in MANDATORY_PIDS, BANNED_PIDS,
+  # PID_GROUPS, PID_DEPENDENCIES and PID_REVERSE_DEPENDENCIES, mapping it to
+  # its Pid object (or None if unknown).
+  _PID_BY_NAME = None
+  _MANDATORY_PID_VALUES = None
+  _MANDATORY_PID_NAME_BY_VALUE = None
+  _BANNED_PID_VALUES = None
+  _BANNED_PID_NAME_BY_VALUE = None
+
+  def _GetPidsByName(self):
+    """Batch-resolve every PID name this test references, once."""
+    cls = GetSupportedParameters
+    if cls._PID_BY_NAME is None:
+      names = set(self.MANDATORY_PIDS)
+      names.update(self.BANNED_PIDS)
+      for pid_names in self.PID_GROUPS:
+        names.update(pid_names)
+      for p, dependent_pids in self.PID_DEPENDENCIES:
+        names.add(p)
+        names.update(dependent_pids)
+      for p, rev_dependent_pids in self.PID_REVERSE_DEPENDENCIES:
+        names.add(p)
+        names.update(rev_dependent_pids)
+      cls._PID_BY_NAME = dict((name, self.LookupPid(name)) for name in names)
+
+      mandatory = [cls._PID_BY_NAME[p] for p in self.MANDATORY_PIDS]
+      cls._MANDATORY_PID_VALUES = frozenset(pid.value for pid in mandatory)
+      cls._MANDATORY_PID_NAME_BY_VALUE = dict(
+          (pid.value, pid.name) for pid in mandatory)
+
+      banned = [cls._PID_BY_NAME[p] for p in self.BANNED_PIDS]
+      cls._BANNED_PID_VALUES = frozenset(pid.value for pid in banned)
+      cls._BANNED_PID_NAME_BY_VALUE = dict(
+          (pid.value, pid.name) for pid in banned)
+    return cls._PID_BY_NAME
+
+  def _GetMandatoryPidInfo(self):
+    self._GetPidsByName()
+    cls = GetSupportedParameters
+    return cls._MANDATORY_PID_VALUES, cls._MANDATORY_PID_NAME_BY_VALUE
+
+  def _GetBannedPidInfo(self):
+    self._GetPidsByName()
+    cls = GetSupportedParameters
+    return cls._BANNED_PID_VALUES, cls._BANNED_PID_NAME_BY_VALUE
+
   def Test(self):
     self.AddExpectedResults([
       # TODO(simon): We should cross check this against support for anything
@@ -766,37 +829,35 @@ class GetSupportedParameters(ResponderTestFixture):
       return
 
     self.SetProperty('acks_supported_parameters', True)
-    mandatory_pids = {}
-    for p in self.MANDATORY_PIDS:
-      pid = self.LookupPid(p)
-      mandatory_pids[pid.value] = pid
-
-    banned_pids = {}
-    for p in self.BANNED_PIDS:
-      pid = self.LookupPid(p)
-      banned_pids[pid.value] = pid
+    mandatory_pid_values, mandatory_pid_names = self._GetMandatoryPidInfo()
+    banned_pid_values, banned_pid_names = self._GetBannedPidInfo()
 
     supported_parameters = []
     manufacturer_parameters = []
     count_by_pid = {}
 
+    # Bound locals, responders can return hundreds of params.
+    supported_append = supported_parameters.append
+    manufacturer_append = manufacturer_parameters.append
+    manufacturer_pid_min = RDM_MANUFACTURER_PID_MIN
+    manufacturer_pid_max = RDM_MANUFACTURER_PID_MAX
+
     for item in fields['params']:
       param_id = item['param_id']
       count_by_pid[param_id] = count_by_pid.get(param_id, 0) + 1
-      if param_id in banned_pids:
+      if param_id in banned_pid_values:
         self.AddWarning('%s listed in supported parameters' %
-                        banned_pids[param_id].name)
+                        banned_pid_names[param_id])
         continue
 
-      if param_id in mandatory_pids:
+      if param_id in mandatory_pid_values:
         self.AddAdvisory('%s listed in supported parameters' %
-                         mandatory_pids[param_id].name)
+                         mandatory_pid_names[param_id])
         continue
 
-      supported_parameters.append(param_id)
-      if (param_id >= RDM_MANUFACTURER_PID_MIN and
-          param_id <= RDM_MANUFACTURER_PID_MAX):
-        manufacturer_parameters.append(param_id)
+      supported_append(param_id)
+      if manufacturer_pid_min <= param_id <= manufacturer_pid_max:
+        manufacturer_append(param_id)
 
     # Check for duplicate PIDs
     for pid, count in count_by_pid.iteritems():
@@ -812,12 +873,15 @@ class GetSupportedParameters(ResponderTestFixture):
     self.SetProperty('manufacturer_parameters', manufacturer_parameters)
     self.SetProperty('supported_parameters', supported_parameters)
 
+    pid_by_name = self._GetPidsByName()
+    supported_set = frozenset(supported_parameters)
+
     for pid_names in self.PID_GROUPS:
       supported_pids = []
       unsupported_pids = []
       for pid_name in pid_names:
-        pid = self.LookupPid(pid_name)
-        if pid.value in supported_parameters:
+        pid = pid_by_name[pid_name]
+        if pid.value in supported_set:
           supported_pids.append(pid.name)
         else:
           unsupported_pids.append(pid.name)
@@ -828,44 +892,43 @@ class GetSupportedParameters(ResponderTestFixture):
             (','.join(supported_pids), ','.join(unsupported_pids)))
 
     for p, dependent_pids in self.PID_DEPENDENCIES:
-      pid = self.LookupPid(p)
+      pid = pid_by_name[p]
       if pid is None:
         self.SetBroken('Failed to lookup info for PID %s' % p)
         return
 
-      if pid.value not in supported_parameters:
+      if pid.value not in supported_set:
         continue
 
       unsupported_pids = []
       for pid_name in dependent_pids:
-        pid = self.LookupPid(pid_name)
+        pid = pid_by_name[pid_name]
         if pid is None:
           self.SetBroken('Failed to lookup info for PID %s' % pid_name)
           return
 
-        if pid.value not in supported_parameters:
+        if pid.value not in supported_set:
           unsupported_pids.append(pid.name)
       if unsupported_pids:
         self.AddAdvisory('%s supported but %s is not' %
                          (p, ','.join(unsupported_pids)))
 
     for p, rev_dependent_pids in self.PID_REVERSE_DEPENDENCIES:
-      if self.LookupPid(p).value in supported_parameters:
+      if pid_by_name[p].value in supported_set:
         continue
 
       dependent_pids = []
       for pid_name in rev_dependent_pids:
-        pid = self.LookupPid(pid_name)
+        pid = pid_by_name[pid_name]
         if pid is None:
           self.SetBroken('Failed to lookup info for PID %s' % pid_name)
           return
 
-        if pid.value in supported_parameters:
+        if pid.value in supported_set:
           dependent_pids.append(pid.name)
-      if (dependent_pids and
-         (self.LookupPid(p).value in supported_parameters)):
+      if dependent_pids:
         self.AddAdvisory('%s supported but %s is not' %
-                         (','.join(unsupported_pids), p))
+                         (','.join(dependent_pids), p))
 
 
 class GetSupportedParametersWithData(TestMixins.GetWithDataMixin,
@@ -975,14 +1038,20 @@ class FindSubDevices(ResponderTestFixture):
     self._sub_device_addresses = {}  # Index to start address mapping
     self._sub_device_footprints = {}  # Index to footprint mapping
     self._current_index = 0  # the current sub device we're trying to query
+
+    if self._device_count == 0:
+      # Nothing to find, skip the state machine entirely.
+      self.SetProperty('sub_device_addresses', {})
+      self.SetProperty('sub_device_footprints', {})
+      self.SetNotRun('No sub devices declared')
+      return
+
     self._CheckForSubDevice()
 
   def _CheckForSubDevice(self):
     # For each supported param message we should either see a sub device out of
     # range or an ack
     if len(self._sub_device_addresses) == self._device_count:
-      if self._device_count == 0:
-        self.SetNotRun('No sub devices declared')
       self.SetProperty('sub_device_addresses', self._sub_device_addresses)
       self.SetProperty('sub_device_footprints', self._sub_device_footprints)
       self.Stop()
@@ -1220,7 +1289,7 @@ class GetParameterDescriptionForNonManufacturerPid(ParamDescriptionTestFixture):
   REQUIRES = ['manufacturer_parameters']
 
   def Test(self):
-    device_info_pid = self.LookupPid('DEVICE_INFO')
+    device_info_pid = self.LookupPidCached('DEVICE_INFO')
     results = [
       self.NackGetResult(RDMNack.NR_UNKNOWN_PID),
       self.NackGetResult(
@@ -2013,7 +2082,7 @@ class SetDMXPersonality(OptionalParameterTestFixture):
     self.SendGet(ROOT_DEVICE, self.pid)
 
   def VerifyDeviceInfo(self):
-    device_info_pid = self.LookupPid('DEVICE_INFO')
+    device_info_pid = self.LookupPidCached('DEVICE_INFO')
 
     next_action = self.NextPersonality
     if self._personalities[0]['slots_required'] == 0:
@@ -2032,7 +2101,7 @@ class SetDMXPersonality(OptionalParameterTestFixture):
     self.SendGet(ROOT_DEVICE, device_info_pid)
 
   def VerifyFootprint0DMXStartAddress(self):
-    address_pid = self.LookupPid('DMX_START_ADDRESS')
+    address_pid = self.LookupPidCached('DMX_START_ADDRESS')
     expected_results = [
       AckGetResult(
         address_pid.value,
@@ -2342,48 +2411,26 @@ class SetBroadcastDMXStartAddress(TestMixins.SetNonUnicastDMXStartAddressMixin,
     return UID.AllDevices()
 
 
-class SetOutOfRangeDMXStartAddress(ResponderTestFixture):
+class SetOutOfRangeDMXStartAddress(TestMixins.SetIllegalDMXStartAddressMixin,
+                                   ResponderTestFixture):
   """Check that the DMX address can't be set to > 512."""
-  CATEGORY = TestCategory.ERROR_CONDITIONS
   PID = 'DMX_START_ADDRESS'
   # We depend on GetDMXStartAddress to make sure this runs after it, while
   # still allowing this test to run if the other test fails.
   DEPS = [GetDMXStartAddress]
   REQUIRES = ['dmx_footprint']
-
-  def Test(self):
-    if self.Property('dmx_footprint') > 0:
-      self.AddExpectedResults(self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    else:
-      self.AddExpectedResults([
-          self.NackSetResult(RDMNack.NR_UNKNOWN_PID),
-          self.NackSetResult(RDMNack.NR_UNSUPPORTED_COMMAND_CLASS),
-          self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE)
-      ])
-    data = struct.pack('!H', TestMixins.MAX_DMX_ADDRESS + 1)
-    self.SendRawSet(ROOT_DEVICE, self.pid, data)
+  DATA = UINT16_STRUCT.pack(TestMixins.MAX_DMX_ADDRESS + 1)
 
 
-class SetZeroDMXStartAddress(ResponderTestFixture):
+class SetZeroDMXStartAddress(TestMixins.SetIllegalDMXStartAddressMixin,
+                             ResponderTestFixture):
   """Check the DMX address can't be set to 0."""
-  CATEGORY = TestCategory.ERROR_CONDITIONS
   PID = 'DMX_START_ADDRESS'
   # We depend on GetDMXStartAddress to make sure this runs after it, while
   # still allowing this test to run if the other test fails.
   DEPS = [GetDMXStartAddress]
   REQUIRES = ['dmx_footprint']
-
-  def Test(self):
-    if self.Property('dmx_footprint') > 0:
-      self.AddExpectedResults(self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    else:
-      self.AddExpectedResults([
-          self.NackSetResult(RDMNack.NR_UNKNOWN_PID),
-          self.NackSetResult(RDMNack.NR_UNSUPPORTED_COMMAND_CLASS),
-          self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE)
-      ])
-    data = struct.pack('!H', 0)
-    self.SendRawSet(ROOT_DEVICE, self.pid, data)
+  DATA = UINT16_STRUCT.pack(0)
 
 
 class SetDMXStartAddressWithNoData(TestMixins.SetWithNoDataMixin,
@@ -2454,8 +2501,8 @@ class GetSlotInfo(OptionalParameterTestFixture):
       self.SetProperty('undefined_type_sec_slots', [])
       return
 
-    slots = [d['slot_offset'] for d in fields['slots']]
-    self.SetProperty('defined_slots', set(slots))
+    defined_slots = frozenset(d['slot_offset'] for d in fields['slots'])
+    self.SetProperty('defined_slots', defined_slots)
     undefined_definition_slots = []
     undefined_type_sec_slots = []
 
@@ -2477,7 +2524,7 @@ class GetSlotInfo(OptionalParameterTestFixture):
           undefined_definition_slots.append(slot['slot_offset'])
       else:
         # slot_label_id must reference a defined slot
-        if slot['slot_label_id'] not in slots:
+        if slot['slot_label_id'] not in defined_slots:
           self.AddWarning(
               'Slot %d is of type secondary and references an unknown slot %d'
               % (slot['slot_offset'], slot['slot_label_id']))
@@ -2680,11 +2727,11 @@ class GetDefaultSlotValues(OptionalParameterTestFixture):
           slot['slot_offset'])
       default_slots.add(slot['slot_offset'])
 
-    for slot_offset in defined_slots:
-      if slot_offset not in default_slots:
-        self.AddAdvisory(
-          "SLOT_INFO contained slot %d, which wasn't in DEFAULT_SLOT_VALUE" %
-          slot_offset)
+    # Usually empty, so compute the difference in one set op.
+    for slot_offset in sorted(defined_slots - default_slots):
+      self.AddAdvisory(
+        "SLOT_INFO contained slot %d, which wasn't in DEFAULT_SLOT_VALUE" %
+        slot_offset)
 
 
 class GetDefaultSlotValueWithData(TestMixins.GetWithDataMixin,
@@ -2724,18 +2771,22 @@ class CheckSensorConsistency(ResponderTestFixture):
     return False
 
   def IsSupported(self, pid):
-    return pid.value in self.Property('supported_parameters')
+    return pid.value in self._supported_parameters
 
   def CheckConsistency(self, pid_name, check_for_support=True):
     pid = self.LookupPid(pid_name)
     if (check_for_support and
         (not self.IsSupported(pid)) and
-        self.Property('sensor_count')) > 0:
+        self._sensor_count) > 0:
       self.AddAdvisory('%s not supported but sensor count was > 0' % pid)
-    if self.IsSupported(pid) and self.Property('sensor_count') == 0:
+    if self.IsSupported(pid) and self._sensor_count == 0:
       self.AddAdvisory('%s supported but sensor count was 0' % pid)
 
   def Test(self):
+    # Cache the properties, they don't change for the life of the test.
+    self._sensor_count = self.Property('sensor_count')
+    self._supported_parameters = self.Property('supported_parameters')
+
     self.CheckConsistency('SENSOR_DEFINITION')
     self.CheckConsistency('SENSOR_VALUE')
     self.CheckConsistency('RECORD_SENSORS',
@@ -2754,17 +2805,20 @@ class GetSensorDefinition(OptionalParameterTestFixture):
   MAX_SENSOR_INDEX = 0xfe
   RECORDED_VALUE_MASK = 0x01
 
-  PREDICATE_DICT = {
-      '==': operator.eq,
-      '<': operator.lt,
-      '>': operator.gt,
-  }
-
   def Test(self):
     # Default to false
     self._sensors = {}  # Stores the discovered sensors
     self._current_index = -1  # The current sensor we're trying to query
     self._sensor_holes = []  # Indices of sensors that are missing
+    self._sensor_count = self.Property('sensor_count')
+
+    # The expected results are the same for every probe; the result objects
+    # are immutable so build them once.
+    self._probe_results = [
+      self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE,
+                         action=self._AddToHoles),
+      self.AckGetResult(action=self._CheckForSensor)
+    ]
 
     self._CheckForSensor()
 
@@ -2779,19 +2833,19 @@ class GetSensorDefinition(OptionalParameterTestFixture):
     if self.PidSupported():
       # If this PID is supported we attempt to locate all sensors
       if self._current_index == self.MAX_SENSOR_INDEX:
-        if len(self._sensors) < self.Property('sensor_count'):
+        if len(self._sensors) < self._sensor_count:
           self.AddWarning('Only found %d/%d sensors' %
-                          (len(self._sensors), self.Property('sensor_count')))
-        elif len(self._sensors) > self.Property('sensor_count'):
+                          (len(self._sensors), self._sensor_count))
+        elif len(self._sensors) > self._sensor_count:
           self.AddWarning('Found too many %d/%d sensors' %
-                          (len(self._sensors), self.Property('sensor_count')))
+                          (len(self._sensors), self._sensor_count))
 
         self.SetProperty('sensor_definitions', self._sensors)
 
-        supports_recording = False
-        for sensor_def in self._sensors.itervalues():
-          supports_recording |= (
-              sensor_def['supports_recording'] & self.RECORDED_VALUE_MASK)
+        # any() stops at the first sensor that declares recording support
+        supports_recording = any(
+            sensor_def['supports_recording'] & self.RECORDED_VALUE_MASK
+            for sensor_def in self._sensors.itervalues())
         self.SetProperty('sensor_recording_supported', supports_recording)
 
         self._MissingSensorWarning()
@@ -2799,11 +2853,7 @@ class GetSensorDefinition(OptionalParameterTestFixture):
         return
 
       # For each message we should either see a NR_DATA_OUT_OF_RANGE or an ack
-      self.AddExpectedResults([
-        self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE,
-                           action=self._AddToHoles),
-        self.AckGetResult(action=self._CheckForSensor)
-      ])
+      self.AddExpectedResults(self._probe_results)
     else:
       # Not supported, just check we get a NR_UNKNOWN_PID
       self.AddExpectedResults(self.NackGetResult(RDMNack.NR_UNKNOWN_PID))
@@ -2852,15 +2902,14 @@ class GetSensorDefinition(OptionalParameterTestFixture):
       self.AddWarning('Unknown prefix %d for sensor %d' %
                       (fields['prefix'], sensor_number))
 
-    self.CheckCondition(sensor_number, fields, 'range_min', '>', 'range_max')
-    self.CheckCondition(sensor_number, fields, 'range_min', '==', 'range_max')
+    self._CheckGreaterThan(sensor_number, fields, 'range_min', 'range_max')
+    self._CheckEqual(sensor_number, fields, 'range_min', 'range_max')
 
-    self.CheckCondition(sensor_number, fields, 'normal_min', '>', 'normal_max')
-    self.CheckCondition(sensor_number, fields, 'normal_min', '==',
-                        'normal_max')
+    self._CheckGreaterThan(sensor_number, fields, 'normal_min', 'normal_max')
+    self._CheckEqual(sensor_number, fields, 'normal_min', 'normal_max')
 
-    self.CheckCondition(sensor_number, fields, 'normal_min', '<', 'range_min')
-    self.CheckCondition(sensor_number, fields, 'normal_max', '>', 'range_max')
+    self._CheckLessThan(sensor_number, fields, 'normal_min', 'range_min')
+    self._CheckGreaterThan(sensor_number, fields, 'normal_max', 'range_max')
 
     if fields['supports_recording'] & 0xfc:
       self.AddWarning('bits 7-2 in the recorded message support fields are set'
@@ -2872,13 +2921,25 @@ class GetSensorDefinition(OptionalParameterTestFixture):
           ' characters, was %s' % (self._current_index,
                                    fields['name'].encode('string-escape')))
 
-  def CheckCondition(self, sensor_number, fields, lhs, predicate_str, rhs):
-    """Check for a condition and add a warning if it isn't true."""
-    predicate = self.PREDICATE_DICT[predicate_str]
-    if predicate(fields[lhs], fields[rhs]):
-      self.AddAdvisory(
-          'Sensor %d, %s (%d) %s %s (%d)' %
-          (sensor_number, lhs, fields[lhs], predicate_str, rhs, fields[rhs]))
+  def _CheckGreaterThan(self, sensor_number, fields, lhs, rhs):
+    """Add an advisory if fields[lhs] > fields[rhs]."""
+    if fields[lhs] > fields[rhs]:
+      self._ConditionAdvisory(sensor_number, fields, lhs, '>', rhs)
+
+  def _CheckLessThan(self, sensor_number, fields, lhs, rhs):
+    """Add an advisory if fields[lhs] < fields[rhs]."""
+    if fields[lhs] < fields[rhs]:
+      self._ConditionAdvisory(sensor_number, fields, lhs, '<', rhs)
+
+  def _CheckEqual(self, sensor_number, fields, lhs, rhs):
+    """Add an advisory if fields[lhs] == fields[rhs]."""
+    if fields[lhs] == fields[rhs]:
+      self._ConditionAdvisory(sensor_number, fields, lhs, '==', rhs)
+
+  def _ConditionAdvisory(self, sensor_number, fields, lhs, predicate_str, rhs):
+    self.AddAdvisory(
+        'Sensor %d, %s (%d) %s %s (%d)' %
+        (sensor_number, lhs, fields[lhs], predicate_str, rhs, fields[rhs]))
 
 
 class GetSensorDefinitionWithNoData(TestMixins.GetWithNoDataMixin,
@@ -2900,7 +2961,7 @@ class GetInvalidSensorDefinition(OptionalParameterTestFixture):
 
   def Test(self):
     self.AddIfGetSupported(self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    data = struct.pack('!B', 0xff)
+    data = UINT8_STRUCT.pack(0xff)
     self.SendRawGet(ROOT_DEVICE, self.pid, data)
 
 
@@ -2936,8 +2997,9 @@ class GetSensorValues(OptionalParameterTestFixture):
   RECORDED_VALUE_MASK = 0x01
 
   def Test(self):
-    # The head of the list is the current sensor we're querying
-    self._sensors = self.Property('sensor_definitions').values()
+    # The head of the queue is the current sensor we're querying
+    self._sensors = collections.deque(
+        self.Property('sensor_definitions').values())
     self._sensor_values = []
 
     if self._sensors:
@@ -2967,7 +3029,7 @@ class GetSensorValues(OptionalParameterTestFixture):
     self.SendGet(ROOT_DEVICE, self.pid, [sensor_index])
 
   def _GetNextSensor(self):
-    self._sensors.pop(0)
+    self._sensors.popleft()
     self._GetSensorValue()
 
   def VerifyResult(self, response, fields):
@@ -3026,12 +3088,13 @@ class GetUndefinedSensorValues(OptionalParameterTestFixture):
 
   def Test(self):
     sensors = self.Property('sensor_definitions')
-    self._missing_sensors = []
-    for i in xrange(0, 0xff):
-      if i not in sensors:
-        self._missing_sensors.append(i)
+    self._missing_sensors = collections.deque(
+        sorted(set(range(0, 0xff)) - set(sensors)))
 
     if self._missing_sensors:
+      # The same immutable result is expected for every missing sensor.
+      self._missing_sensor_result = self.NackGetResult(
+          RDMNack.NR_DATA_OUT_OF_RANGE, action=self._GetSensorValue)
       # Loop and get all values
       self._GetSensorValue()
     else:
@@ -3043,10 +3106,8 @@ class GetUndefinedSensorValues(OptionalParameterTestFixture):
       self.Stop()
       return
 
-    self.AddIfGetSupported(
-        self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE,
-                           action=self._GetSensorValue))
-    self.SendGet(ROOT_DEVICE, self.pid, [self._missing_sensors.pop(0)])
+    self.AddIfGetSupported(self._missing_sensor_result)
+    self.SendGet(ROOT_DEVICE, self.pid, [self._missing_sensors.popleft()])
 
 
 class GetInvalidSensorValue(OptionalParameterTestFixture):
@@ -3056,7 +3117,7 @@ class GetInvalidSensorValue(OptionalParameterTestFixture):
 
   def Test(self):
     self.AddIfGetSupported(self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    data = struct.pack('!B', 0xff)
+    data = UINT8_STRUCT.pack(0xff)
     self.SendRawGet(ROOT_DEVICE, self.pid, data)
 
 
@@ -3079,8 +3140,9 @@ class ResetSensorValue(OptionalParameterTestFixture):
   REQUIRES = ['sensor_definitions']
 
   def Test(self):
-    # The head of the list is the current sensor we're querying
-    self._sensors = self.Property('sensor_definitions').values()
+    # The head of the queue is the current sensor we're querying
+    self._sensors = collections.deque(
+        self.Property('sensor_definitions').values())
     self._sensor_values = []
 
     if self._sensors:
@@ -3114,7 +3176,7 @@ class ResetSensorValue(OptionalParameterTestFixture):
     self.SendSet(ROOT_DEVICE, self.pid, [sensor_index])
 
   def _ResetNextSensor(self):
-    self._sensors.pop(0)
+    self._sensors.popleft()
     self._ResetSensor()
 
   def VerifyResult(self, response, fields):
@@ -3134,10 +3196,9 @@ class ResetAllSensorValues(OptionalParameterTestFixture):
   ALL_SENSORS = 0xff
 
   def Test(self):
-    supports_recording = False
-    for sensor_def in self.Property('sensor_definitions').values():
-      supports_recording |= (
-          sensor_def['supports_recording'] & self.RECORDED_VALUE_MASK)
+    supports_recording = any(
+        sensor_def['supports_recording'] & self.RECORDED_VALUE_MASK
+        for sensor_def in self.Property('sensor_definitions').values())
 
     # Some devices don't have set
     results = [self.NackSetResult(RDMNack.NR_UNSUPPORTED_COMMAND_CLASS)]
@@ -3209,8 +3270,9 @@ class RecordSensorValues(OptionalParameterTestFixture):
   RECORDED_VALUE_MASK = 0x01
 
   def Test(self):
-    # The head of the list is the current sensor we're querying
-    self._sensors = self.Property('sensor_definitions').values()
+    # The head of the queue is the current sensor we're querying
+    self._sensors = collections.deque(
+        self.Property('sensor_definitions').values())
     self._sensor_values = []
 
     if self._sensors:
@@ -3243,7 +3305,7 @@ class RecordSensorValues(OptionalParameterTestFixture):
     self.SendSet(ROOT_DEVICE, self.pid, [self._sensors[0]['sensor_number']])
 
   def _RecordNextSensor(self):
-    self._sensors.pop(0)
+    self._sensors.popleft()
     self._RecordSensor()
 
 
@@ -3551,20 +3613,23 @@ class SetLampOnMode(TestMixins.SetMixin, OptionalParameterTestFixture):
   REQUIRES = ['lamp_on_mode']
   ALLOWED_MODES = [0, 1, 2]
   ALL_MODES = ALLOWED_MODES + [3] + range(0x80, 0xe0)
+  # Frozenset of ALL_MODES for O(1) membership; the list keeps the cycling
+  # order.
+  ALL_MODES_SET = frozenset(ALL_MODES)
 
   def OldValue(self):
     old = self.Property('lamp_on_mode')
-    if old in self.ALL_MODES:
+    if old in self.ALL_MODES_SET:
       return old
     return self.ALL_MODES[0]
 
   def NewValue(self):
     old_value = self.OldValue()
     try:
-      self.ALLOWED_MODES.index(old_value)
+      index = self.ALLOWED_MODES.index(old_value)
     except ValueError:
       return self.ALLOWED_MODES[0]
-    return self.ALLOWED_MODES[(old_value + 1) % len(self.ALLOWED_MODES)]
+    return self.ALLOWED_MODES[(index + 1) % len(self.ALLOWED_MODES)]
 
 
 class SetLampOnModeWithNoData(TestMixins.SetWithNoDataMixin,
@@ -3636,6 +3701,8 @@ class SetDevicePowerCycles(TestMixins.SetUInt32Mixin,
     return self.Property('power_cycles')
 
   def Test(self):
+    # VerifySet reads the value back from the mixin's _new_value.
+    self._new_value = self.NewValue()
     self.AddIfSetSupported([
       self.AckSetResult(action=self.VerifySet),
       self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE),
@@ -3644,7 +3711,7 @@ class SetDevicePowerCycles(TestMixins.SetUInt32Mixin,
         advisory='SET for %s returned unsupported command class' %
                  self.pid.name),
     ])
-    self.SendSet(ROOT_DEVICE, self.pid, [self.NewValue()])
+    self.SendSet(ROOT_DEVICE, self.pid, [self._new_value])
 
 
 class SetDevicePowerCyclesWithNoData(TestMixins.SetWithNoDataMixin,
@@ -3702,20 +3769,21 @@ class SetDisplayInvert(TestMixins.SetMixin,
   # Some devices can't do auto so we just use on and off here
   ALLOWED_MODES = [0, 1]
   ALL_MODES = ALLOWED_MODES + [2]
+  ALL_MODES_SET = frozenset(ALL_MODES)
 
   def OldValue(self):
     old = self.Property('display_invert')
-    if old in self.ALL_MODES:
+    if old in self.ALL_MODES_SET:
       return old
     return self.ALL_MODES[0]
 
   def NewValue(self):
     old_value = self.OldValue()
     try:
-      self.ALLOWED_MODES.index(old_value)
+      index = self.ALLOWED_MODES.index(old_value)
     except ValueError:
       return self.ALLOWED_MODES[0]
-    return self.ALLOWED_MODES[(old_value + 1) % len(self.ALLOWED_MODES)]
+    return self.ALLOWED_MODES[(index + 1) % len(self.ALLOWED_MODES)]
 
 
 class SetDisplayInvertWithNoData(TestMixins.SetWithNoDataMixin,
@@ -3932,17 +4000,21 @@ class GetRealTimeClock(OptionalParameterTestFixture):
       'hour': (0, 23),
       'minute': (0, 59),
   }
+  # The expected fields and the range checks don't change, so build them
+  # once. 'second' has no range check: any 0-255 uint8 raw value is allowed.
+  FIELD_NAMES = ('year', 'month', 'day', 'hour', 'minute', 'second')
+  RANGE_ITEMS = tuple(ALLOWED_RANGES.items())
 
   def Test(self):
     self.AddIfGetSupported(
-      self.AckGetResult(field_names=self.ALLOWED_RANGES.keys() + ['second']))
+      self.AckGetResult(field_names=self.FIELD_NAMES))
     self.SendGet(ROOT_DEVICE, self.pid)
 
   def VerifyResult(self, response, fields):
     if not response.WasAcked():
       return
 
-    for field, valid_range in self.ALLOWED_RANGES.iteritems():
+    for field, valid_range in self.RANGE_ITEMS:
       value = fields[field]
       if value < valid_range[0] or value > valid_range[1]:
         self.AddWarning('%s in GET %s is out of range, was %d, expected %s' %
@@ -4177,11 +4249,14 @@ class GetPowerState(TestMixins.GetMixin, OptionalParameterTestFixture):
 
   # The allowed power states
   ALLOWED_STATES = [0, 1, 2, 0xff]
+  # Frozenset of ALLOWED_STATES for O(1) membership; the list keeps the
+  # cycling order used by SetPowerState.
+  ALLOWED_STATES_SET = frozenset(ALLOWED_STATES)
 
   def VerifyResult(self, response, fields):
     super(GetPowerState, self).VerifyResult(response, fields)
     if response.WasAcked():
-      if fields['power_state'] not in self.ALLOWED_STATES:
+      if fields['power_state'] not in self.ALLOWED_STATES_SET:
         self.AddWarning('Power state of 0x%hx is not defined' %
                         fields['power_state'])
 
@@ -4201,19 +4276,19 @@ class SetPowerState(TestMixins.SetMixin, OptionalParameterTestFixture):
 
   def OldValue(self):
     old = self.Property('power_state')
-    if old in GetPowerState.ALLOWED_STATES:
+    if old in GetPowerState.ALLOWED_STATES_SET:
       return old
     return GetPowerState.ALLOWED_STATES[0]
 
   def NewValue(self):
     old_value = self.Property('power_state')
     try:
-      GetPowerState.ALLOWED_STATES.index(old_value)
+      index = GetPowerState.ALLOWED_STATES.index(old_value)
     except ValueError:
       return GetPowerState.ALLOWED_STATES[0]
 
     length = len(GetPowerState.ALLOWED_STATES)
-    return GetPowerState.ALLOWED_STATES[(old_value + 1) % length]
+    return GetPowerState.ALLOWED_STATES[(index + 1) % length]
 
 
 class SetPowerStateWithNoData(TestMixins.SetWithNoDataMixin,
@@ -4323,6 +4398,15 @@ class FindSelfTests(OptionalParameterTestFixture):
   def Test(self):
     self._self_tests = {}  # Stores the discovered self tests
     self._current_index = 0  # The current self test we're trying to query
+    # PID support doesn't change mid-test and the expected results are the
+    # same for all 255 probes, so resolve both once.
+    self._pid_supported = self.PidSupported()
+    if self._pid_supported:
+      self._probe_results = [
+        self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE,
+                           action=self._CheckForSelfTest),
+        self.AckGetResult(action=self._CheckForSelfTest)
+      ]
     self._CheckForSelfTest()
 
   def _CheckForSelfTest(self):
@@ -4332,12 +4416,8 @@ class FindSelfTests(OptionalParameterTestFixture):
       self.Stop()
       return
 
-    if self.PidSupported():
-      self.AddExpectedResults([
-        self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE,
-                           action=self._CheckForSelfTest),
-        self.AckGetResult(action=self._CheckForSelfTest)
-      ])
+    if self._pid_supported:
+      self.AddExpectedResults(self._probe_results)
     else:
       self.AddExpectedResults(self.NackGetResult(RDMNack.NR_UNKNOWN_PID))
 
@@ -4726,7 +4806,7 @@ class SetOutOfRangeDMXBlockAddress(OptionalParameterTestFixture):
 
   def Test(self):
     self.AddIfSetSupported(self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    data = struct.pack('!H', TestMixins.MAX_DMX_ADDRESS + 1)
+    data = UINT16_STRUCT.pack(TestMixins.MAX_DMX_ADDRESS + 1)
     self.SendRawSet(ROOT_DEVICE, self.pid, data)
 
 
@@ -6713,7 +6793,7 @@ class GetPresetStatusPresetOff(OptionalParameterTestFixture):
 
   def Test(self):
     self.AddIfGetSupported(self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    data = struct.pack('!H', 0)
+    data = UINT16_STRUCT.pack(0)
     self.SendRawGet(ROOT_DEVICE, self.pid, data)
 
 
@@ -6724,7 +6804,7 @@ class GetPresetStatusPresetScene(OptionalParameterTestFixture):
 
   def Test(self):
     self.AddIfGetSupported(self.NackGetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
-    data = struct.pack('!H', 0xffff)
+    data = UINT16_STRUCT.pack(0xffff)
     self.SendRawGet(ROOT_DEVICE, self.pid, data)
 
 
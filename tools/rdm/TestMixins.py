@@ -485,8 +485,10 @@ class SetMixin(ResponderTestFixture):
                      (self.__class__.__name__))
       return
 
-    new_value = self.NewValue()
-    if new_value is None:
+    # NewValue is derived from properties which don't change while the test
+    # runs, so resolve it once and reuse it in VerifySet.
+    self._new_value = self.NewValue()
+    if self._new_value is None:
       return
 
     self.AddIfSetSupported([
@@ -496,13 +498,13 @@ class SetMixin(ResponderTestFixture):
         advisory='SET for %s returned unsupported command class' %
                  self.pid.name),
     ])
-    self.SendSet(PidStore.ROOT_DEVICE, self.pid, [new_value])
+    self.SendSet(PidStore.ROOT_DEVICE, self.pid, [self._new_value])
 
   def VerifySet(self):
     self.AddExpectedResults(
       self.AckGetResult(
           field_names=self.EXPECTED_FIELDS,
-          field_values={self.EXPECTED_FIELDS[0]: self.NewValue()}))
+          field_values={self.EXPECTED_FIELDS[0]: self._new_value}))
     self.SendGet(PidStore.ROOT_DEVICE, self.pid)
 
   def ResetState(self):
@@ -594,7 +596,7 @@ class SetDMXStartAddressMixin(ResponderTestFixture):
     self.SendGet(PidStore.ROOT_DEVICE, self.pid)
 
   def VerifyDeviceInfo(self):
-    device_info_pid = self.LookupPid('DEVICE_INFO')
+    device_info_pid = self.LookupPidCached('DEVICE_INFO')
     self.AddExpectedResults(
       AckGetResult(
         device_info_pid.value,
@@ -612,6 +614,28 @@ class SetDMXStartAddressMixin(ResponderTestFixture):
     self._wrapper.Run()
 
 
+class SetIllegalDMXStartAddressMixin(ResponderTestFixture):
+  """Send a raw SET DMX_START_ADDRESS with an illegal address.
+
+    Subclasses must define DATA, the packed start address to send. Devices
+    with a footprint must NACK with NR_DATA_OUT_OF_RANGE; devices without
+    one may not support the PID or the SET at all.
+  """
+  CATEGORY = TestCategory.ERROR_CONDITIONS
+  DATA = None
+
+  def Test(self):
+    if self.Property('dmx_footprint') > 0:
+      self.AddExpectedResults(self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE))
+    else:
+      self.AddExpectedResults([
+          self.NackSetResult(RDMNack.NR_UNKNOWN_PID),
+          self.NackSetResult(RDMNack.NR_UNSUPPORTED_COMMAND_CLASS),
+          self.NackSetResult(RDMNack.NR_DATA_OUT_OF_RANGE)
+      ])
+    self.SendRawSet(PidStore.ROOT_DEVICE, self.pid, self.DATA)
+
+
 class SetNonUnicastDMXStartAddressMixin(SetDMXStartAddressMixin):
   """Send a set dmx start address to a non unicast UID."""
 
@@ -1175,6 +1199,15 @@ class GetSettingDescriptionsMixin(ResponderTestFixture):
       self.SendGet(ROOT_DEVICE, self.pid, [self.FIRST_INDEX_OFFSET])
       return
 
+    # The expected results are the same for every setting; the result
+    # objects are immutable so build them once.
+    self._description_results = [
+        self.AckGetResult(field_names=self.EXPECTED_FIELDS,
+                          action=self._GetNextDescription)]
+    for nack in self.ALLOWED_NACKS:
+      self._description_results.append(
+          self.NackGetResult(nack, action=self._GetNextDescription))
+
     # Otherwise fetch the description for each known setting.
     self._GetNextDescription()
 
@@ -1183,11 +1216,7 @@ class GetSettingDescriptionsMixin(ResponderTestFixture):
       self.Stop()
       return
 
-    results = [self.AckGetResult(field_names=self.EXPECTED_FIELDS,
-                                 action=self._GetNextDescription)]
-    for nack in self.ALLOWED_NACKS:
-      results.append(self.NackGetResult(nack, action=self._GetNextDescription))
-    self.AddIfGetSupported(results)
+    self.AddIfGetSupported(self._description_results)
     self.current_item = self.items.pop()
     self.SendGet(ROOT_DEVICE, self.pid, [self.current_item])
 